@@ -1,13 +1,17 @@
 import datetime
-import time as time_module
 import sys
 import os
+import hashlib
+import tempfile
+import concurrent.futures
+import multiprocessing
+import shutil
+import subprocess
+import weakref
 
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes
-from matplotlib import rc_context
 import scipy.stats
 import theano
 import matplotlib
@@ -36,12 +40,60 @@ post_style = {
     "density": True,
     "color": "tab:orange",
     "label": "Posterior",
-    "zorder": -2,
+}
+# styling for the median and CI in the upper left corner of the distributions
+# of figure 0, and for the median and the CI below it in the distributions figure
+text_style = {
+    "horizontalalignment": "left",
+    "verticalalignment": "top",
+}
+median_style = {
+    "fontsize": 12,
+    "horizontalalignment": "center",
+    "verticalalignment": "top",
+    "bbox": {"facecolor": "white", "alpha": 0.5, "edgecolor": "none"},
+}
+ci_style = {
+    "fontsize": 9,
+    "horizontalalignment": "center",
+    "verticalalignment": "top",
 }
 
-# set to None to keep everything a vector, with `-1` Posteriors are rastered (see above)
+# the credible intervals of the timeseries are rastered, everything else is kept
+# as a vector. set to False to keep the intervals a vector, too
+rasterize_bands = True
+
+# deprecated, the figures of this script no longer use it. kept with its old value
+# for the notebook cells that call `ax.set_rasterization_zorder` after the exec
 rasterization_zorder = -1
 
+# sampled traces are saved here and reloaded as long as the data and the model
+# settings do not change, set to None to always sample
+trace_cache_dir = ".trace_cache"
+
+# the bands of the timeseries are computed from a random subset of the samples,
+# beyond a few hundred the figures do not change. set to None to use all of them
+num_samples_plot = 500
+
+# the four scenarios are sampled in parallel processes which share the cores, each
+# runs one chain per core. the draws are split between the chains so that the total
+# number of samples stays that of pm.sample's defaults, 3000 draws in max(2, cores)
+# chains with at most 4 cores. every chain is tuned on its own, with many cores the
+# tuning takes a larger share of the time.
+# the posteriors are well behaved, a longer tuning replaces the advi initialization
+num_cores_per_model = max(1, (os.cpu_count() or 1) // 4)
+num_chains = max(2, num_cores_per_model)
+num_samples_total = 3000 * max(2, min(os.cpu_count() or 1, 4))
+sample_kwargs = dict(
+    init="jitter+adapt_diag",
+    tune=1000,
+    draws=num_samples_total // num_chains,
+    chains=num_chains,
+    cores=num_cores_per_model,
+    target_accept=0.9,
+    progressbar=False,
+)
+
 country = "Germany"
 confirmed_cases = cov19.get_jhu_confirmed_cases()
 date_data_begin = datetime.datetime(2020, 3, 1)
@@ -64,6 +116,41 @@ cases_obs = cov19.filter_one_country(
     confirmed_cases, country, date_data_begin, date_data_end
 )
 
+# dates of the data and of the forecast as matplotlib date numbers, day 0 is the
+# last data point. the new cases are one element shorter, use `mpl_dates_past[1:]`
+mpl_date_data_begin = matplotlib.dates.date2num(date_data_begin)
+mpl_date_data_end = matplotlib.dates.date2num(date_data_end)
+mpl_date_begin_sim = matplotlib.dates.date2num(date_begin_sim)
+mpl_dates_past = mpl_date_data_end + np.arange(-len(cases_obs) + 1, 1)
+mpl_dates_futu = mpl_date_data_end + np.arange(0, num_days_future + 1)
+
+# prior means of the change points, these are also needed by some plot functions
+prior_date_mild_dist_begin = datetime.datetime(2020, 3, 9)
+prior_date_strong_dist_begin = datetime.datetime(2020, 3, 16)
+prior_date_contact_ban_begin = datetime.datetime(2020, 3, 23)
+mpl_prior_date_mild_dist_begin = matplotlib.dates.date2num(prior_date_mild_dist_begin)
+mpl_prior_date_strong_dist_begin = matplotlib.dates.date2num(
+    prior_date_strong_dist_begin
+)
+mpl_prior_date_contact_ban_begin = matplotlib.dates.date2num(
+    prior_date_contact_ban_begin
+)
+
+# x limits of the distributions of the begin of the mild and strong distancing
+limits_mild_dist_begin = tuple(
+    matplotlib.dates.date2num([datetime.date(2020, 3, 2), datetime.date(2020, 3, 12)])
+)
+limits_strong_dist_begin = tuple(
+    matplotlib.dates.date2num([datetime.date(2020, 3, 13), datetime.date(2020, 3, 23)])
+)
+
+# effective growth rates shown in the distributions and their priors, which do not
+# change between figures. the prior of lambda is shifted by mu = 1/8
+limit_lambda = (-0.1, 0.5)
+x_lambda = np.linspace(*limit_lambda, num=100)
+prior_lambda_0 = scipy.stats.lognorm(scale=0.4, s=0.5).pdf(x_lambda + 1 / 8)
+prior_lambda_1 = scipy.stats.lognorm(scale=0.2, s=0.5).pdf(x_lambda + 1 / 8)
+
 # ------------------------------------------------------------------------------ #
 # main functions
 # ------------------------------------------------------------------------------ #
@@ -75,15 +162,59 @@ def run_model_three_change_points():
         "day before yesterday: {}".format(date_data_end.isoformat(), *cases_obs[:-3:-1])
     )
 
-    # these variables are needed by some plot functions
-    global prior_date_mild_dist_begin
-    global prior_date_strong_dist_begin
-    global prior_date_contact_ban_begin
-    prior_date_mild_dist_begin = datetime.datetime(2020, 3, 9)
-    prior_date_strong_dist_begin = datetime.datetime(2020, 3, 16)
-    prior_date_contact_ban_begin = datetime.datetime(2020, 3, 23)
+    # invalidate cached traces when the data, the priors or the sampling change
+    cache_key = hashlib.sha1(
+        cases_obs.tobytes()
+        + repr(
+            (get_change_points(), date_begin_sim, num_days_sim, sample_kwargs)
+        ).encode()
+    ).hexdigest()[:16]
+
+    models = [_build_model(num_change_points) for num_change_points in range(4)]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = trace_cache_dir if trace_cache_dir is not None else tmp_dir
+        directories = [
+            os.path.join(cache_dir, f"{cache_key}_model_{num_change_points}")
+            for num_change_points in range(len(models))
+        ]
+
+        # the scenarios are independent, sample the missing ones in parallel.
+        # models can not be pickled, so every worker builds its own and passes
+        # the trace back through the cache directory
+        missing = [i for i, d in enumerate(directories) if not os.path.exists(d)]
+        if len(missing) > 1:
+            # compile the largest model once here, the workers then load the
+            # shared ops from theano's compile cache instead of all compiling
+            # them at the same time
+            models[max(missing)].logp_dlogp_function()
+        # the notebooks exec this script, so `_sample_model` lives in their
+        # `__main__` and only forked workers know it. forking a process that has
+        # loaded theano and BLAS is only safe on linux, elsewhere the scenarios are
+        # sampled one after the other
+        if missing and sys.platform.startswith("linux"):
+            with concurrent.futures.ProcessPoolExecutor(
+                len(missing), mp_context=multiprocessing.get_context("fork")
+            ) as executor:
+                list(
+                    executor.map(
+                        _sample_model, missing, [directories[i] for i in missing]
+                    )
+                )
+        else:
+            for i in missing:
+                _sample_model(i, directories[i])
+
+        traces = []
+        for directory, model in zip(directories, models):
+            print(f"Loading trace from {directory}")
+            traces.append(pm.load_trace(directory, model=model))
+
+    return models, traces
 
-    change_points = [
+
+def get_change_points():
+    return [
         dict(
             pr_mean_date_begin_transient=prior_date_mild_dist_begin,
             pr_sigma_date_begin_transient=3,
@@ -104,24 +235,31 @@ def run_model_three_change_points():
         ),
     ]
 
-    models = []
-    for num_change_points in range(4):
-        model = cov19.SIR_with_change_points(
-            new_cases_obs=np.diff(cases_obs),
-            change_points_list=change_points[:num_change_points],
-            date_begin_simulation=date_begin_sim,
-            num_days_sim=num_days_sim,
-            diff_data_sim=diff_data_sim,
-            N=83e6,
-            priors_dict=None,
-        )
-        models.append(model)
 
-    traces = []
-    for model in models:
-        traces.append(pm.sample(model=model, init="advi", draws=3000))
+def _build_model(num_change_points):
+    return cov19.SIR_with_change_points(
+        new_cases_obs=np.diff(cases_obs),
+        change_points_list=get_change_points()[:num_change_points],
+        date_begin_simulation=date_begin_sim,
+        num_days_sim=num_days_sim,
+        diff_data_sim=diff_data_sim,
+        N=83e6,
+        priors_dict=None,
+    )
 
-    return models, traces
+
+# runs in a worker process of `run_model_three_change_points`
+def _sample_model(num_change_points, directory):
+    model = _build_model(num_change_points)
+    trace = pm.sample(model=model, **sample_kwargs)
+    with model:
+        r_hat = pm.summary(trace, var_names=["lambda_0", "mu", "I_begin"])["r_hat"]
+    if (r_hat > 1.05).any():
+        print(
+            f"Chains with {num_change_points} change points did not mix, R-hat:\n"
+            f"{r_hat.to_string()}"
+        )
+    pm.save_trace(trace, directory=directory, overwrite=True)
 
 
 def create_figure_0(save_to=None):
@@ -143,130 +281,73 @@ def create_figure_0(save_to=None):
     fig, axes = plt.subplots(1, 4, figsize=(8, 2))
     figs.append(fig)
 
-    limit_lambda = (-0.1, 0.5)
     bins_lambda = np.linspace(*limit_lambda, 30)
+    lambda_0 = trace.lambda_0 - trace.mu
+    lambda_1 = trace.lambda_1 - trace.mu
 
-    # LAM 0
-    ax = axes[0]
-    ax.hist(trace.lambda_0 - trace.mu, bins=bins_lambda, **post_style)
-    x = np.linspace(*limit_lambda, num=100)
-    ax.plot(x, scipy.stats.lognorm.pdf(x + 1 / 8, scale=0.4, s=0.5), **prio_style)
-    ax.set_xlim(*limit_lambda)
-    ax.set_ylabel("Density")
-    ax.set_xlabel("Effective\ngrowth rate $\lambda_0^*$")
-    ax.text(
-        0.05,
-        0.95,
-        print_median_CI(trace.lambda_0 - trace.mu, prec=2),
-        horizontalalignment="left",
-        verticalalignment="top",
-        transform=ax.transAxes,
-    )
-    ax.set_ylim(0, 23)
-
-    # LAM 1
-    ax = axes[1]
-    ax.hist(trace.lambda_1 - trace.mu, bins=bins_lambda, **post_style)
-    x = np.linspace(*limit_lambda, num=100)
-    ax.plot(x, scipy.stats.lognorm.pdf(x + 1 / 8, scale=0.2, s=0.5), **prio_style)
-    ax.set_xlim(*limit_lambda)
-    ax.set_xlabel("Effective\ngrowth rate $\lambda_1^*$")
-    ax.text(
-        0.05,
-        0.95,
-        print_median_CI(trace.lambda_1 - trace.mu, prec=2),
-        horizontalalignment="left",
-        verticalalignment="top",
-        transform=ax.transAxes,
-    )
-    ax.set_ylim(0, 23)
-
-    # TIME 1
-    ax = axes[2]
+    # begin of the change points, counted from the first day of the data in the text
     dates_mild = conv_time_to_mpl_dates(trace.transient_begin_0)
-    limits = matplotlib.dates.date2num(
-        [datetime.date(2020, 3, 2), datetime.date(2020, 3, 12)]
-    )
-    bins = np.arange(limits[0], limits[1] + 1)
-    ax.hist(dates_mild, bins=bins, density=True, color="tab:orange", label="Posterior")
-    x = np.linspace(*limits, num=1000)
-    ax.plot(
-        x,
-        scipy.stats.norm.pdf(
-            x, loc=matplotlib.dates.date2num([prior_date_mild_dist_begin])[0], scale=3
-        ),
-        **prio_style,
-    )
-    ax.set_xlim(limits[0], limits[1])
-    ax.set_xlabel("Time begin\nmild dist. $t_1$")
-    text = print_median_CI(
-        dates_mild - matplotlib.dates.date2num(datetime.datetime(2020, 3, 1)) + 1,
-        prec=1,
-    )
-    ax.text(
-        0.05,
-        0.95,
-        text,
-        horizontalalignment="left",
-        verticalalignment="top",
-        transform=ax.transAxes,
-    )
-    ax.xaxis.set_major_locator(
-        matplotlib.dates.WeekdayLocator(byweekday=matplotlib.dates.SU)
-    )
-    ax.xaxis.set_minor_locator(matplotlib.dates.DayLocator())
-    ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%m/%d"))
-    ax.set_ylim(0, 0.45)
+    bins_mild = np.arange(limits_mild_dist_begin[0], limits_mild_dist_begin[1] + 1)
+    x_mild = np.linspace(*limits_mild_dist_begin, num=1000)
+    prior_mild = _norm_pdf(x_mild, loc=mpl_prior_date_mild_dist_begin, scale=3)
 
-    # TIME 2
-    ax = axes[3]
     dates_strong = conv_time_to_mpl_dates(trace.transient_begin_1)
-    limits = matplotlib.dates.date2num(
-        [datetime.date(2020, 3, 13), datetime.date(2020, 3, 23)]
-    )
-    bins = np.arange(limits[0], limits[1] + 1)
-    ax.hist(
-        dates_strong, bins=bins, density=True, color="tab:orange", label="Posterior"
+    bins_strong = np.arange(
+        limits_strong_dist_begin[0], limits_strong_dist_begin[1] + 1
     )
-    # limits = ax.get_xlim()
-    x = np.linspace(*limits, num=1000)
-    ax.plot(
-        x,
-        scipy.stats.norm.pdf(
-            x, loc=matplotlib.dates.date2num([prior_date_strong_dist_begin])[0], scale=1
+    x_strong = np.linspace(*limits_strong_dist_begin, num=1000)
+    prior_strong = _norm_pdf(x_strong, loc=mpl_prior_date_strong_dist_begin, scale=1)
+
+    # samples, bins, x and prior, label, text, y limits and whether x are dates
+    panels = [
+        (
+            lambda_0,
+            bins_lambda,
+            x_lambda,
+            prior_lambda_0,
+            "Effective\ngrowth rate $\lambda_0^*$",
+            print_median_CI(lambda_0, prec=2),
+            (0, 23),
+            False,
         ),
-        **prio_style,
-    )
-    ax.set_xlim(limits[0], limits[1])
-    ax.set_ylabel("Density")
-    ax.set_xlabel("Time begin\nstrong dist. $t_2$")
-    text = print_median_CI(
-        dates_strong - matplotlib.dates.date2num(datetime.datetime(2020, 3, 1)) + 1,
-        prec=1,
-    )
-    ax.text(
-        0.05,
-        0.95,
-        text,
-        horizontalalignment="left",
-        verticalalignment="top",
-        transform=ax.transAxes,
-    )
-    # ax.xaxis.set_major_locator(matplotlib.dates.AutoDateLocator())
-    ax.xaxis.set_major_locator(
-        matplotlib.dates.WeekdayLocator(byweekday=matplotlib.dates.SU)
-    )
-    ax.xaxis.set_minor_locator(matplotlib.dates.DayLocator())
-    ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%m/%d"))
-    ax.set_ylim(0, 0.45)
-    ax.set_xlim(limits[0], limits[1])
-
-    for ax in axes:
-        ax.set_rasterization_zorder(rasterization_zorder)
+        (
+            lambda_1,
+            bins_lambda,
+            x_lambda,
+            prior_lambda_1,
+            "Effective\ngrowth rate $\lambda_1^*$",
+            print_median_CI(lambda_1, prec=2),
+            (0, 23),
+            False,
+        ),
+        (
+            dates_mild,
+            bins_mild,
+            x_mild,
+            prior_mild,
+            "Time begin\nmild dist. $t_1$",
+            print_median_CI(dates_mild - mpl_date_data_begin + 1, prec=1),
+            (0, 0.45),
+            True,
+        ),
+        (
+            dates_strong,
+            bins_strong,
+            x_strong,
+            prior_strong,
+            "Time begin\nstrong dist. $t_2$",
+            print_median_CI(dates_strong - mpl_date_data_begin + 1, prec=1),
+            (0, 0.45),
+            True,
+        ),
+    ]
+    for ax, panel in zip(axes, panels):
+        _plot_distribution_panel(ax, *panel)
+    axes[0].set_ylabel("Density")
+    axes[3].set_ylabel("Density")
 
     if save_to is not None:
-        fig.savefig(save_to + "Fig_summary_distributions.png", dpi=300)
-        fig.savefig(save_to + "Fig_summary_distributions.pdf", dpi=300)
+        save_figure(fig, save_to + "Fig_summary_distributions")
 
     # ------------------------------------------------------------------------------ #
     # time series
@@ -288,9 +369,9 @@ def create_figure_0(save_to=None):
 
     # NEW CASES
     ax = axes[1]
-    time1 = np.arange(-len(cases_obs) + 2, 1)
-    mpl_dates = conv_time_to_mpl_dates(time1) + diff_data_sim + num_days_data
+    mpl_dates = mpl_dates_past[1:]
     start_date = mpl_dates[0]
+    end_date = mpl_dates_futu[-10]
     diff_cases = np.diff(cases_obs)
     ax.plot(
         mpl_dates,
@@ -301,49 +382,34 @@ def create_figure_0(save_to=None):
         color="tab:blue",
         zorder=5,
     )
-    new_cases_past = trace.new_cases[:, :num_days_data]
-    percentiles = (
-        np.percentile(new_cases_past, q=2.5, axis=0),
-        np.percentile(new_cases_past, q=97.5, axis=0),
-    )
-    ax.plot(
+    new_c_past, _, _, _ = _prepare(trace)
+    lo, _, med, _, hi = _cached(trace, "new_past", lambda: _summarize(new_c_past))
+    ax.plot(mpl_dates, med, color="tab:green", linewidth=3, zorder=0)
+    ax.fill_between(
         mpl_dates,
-        np.median(new_cases_past, axis=0),
+        lo,
+        hi,
+        alpha=0.3,
         color="tab:green",
-        linewidth=3,
-        zorder=0,
-    )
-    ax.fill_between(
-        mpl_dates, percentiles[0], percentiles[1], alpha=0.3, color="tab:green", lw=0
+        lw=0,
+        rasterized=rasterize_bands,
     )
     ax.plot([], [], label=legends[0], alpha=0)
 
-    for trace_scen, color, legend in zip(posterior, colors, legends[1:]):
-        new_cases_past = trace_scen.new_cases[:, :num_days_data]
-        ax.plot(
-            mpl_dates,
-            np.median(new_cases_past, axis=0),
-            "--",
-            color=color,
-            linewidth=1.5,
-        )
-        time2 = np.arange(0, num_days_future + 1)
-        mpl_dates_fut = conv_time_to_mpl_dates(time2) + diff_data_sim + num_days_data
-        end_date = mpl_dates_fut[-10]
-        cases_futu = trace_scen["new_cases"][:, num_days_data:].T
-        median = np.median(cases_futu, axis=-1)
-        percentiles = (
-            np.percentile(cases_futu, q=2.5, axis=-1),
-            np.percentile(cases_futu, q=97.5, axis=-1),
-        )
-        ax.plot(mpl_dates_fut[1:], median, color=color, linewidth=3, label=legend)
+    new_past = _summarize_all(posterior, "new_past", lambda t: _prepare(t)[0])
+    new_futu = _summarize_all(posterior, "new_futu", lambda t: _prepare(t)[1])
+    for past, futu, color, legend in zip(new_past, new_futu, colors, legends[1:]):
+        ax.plot(mpl_dates, past[2], "--", color=color, linewidth=1.5)
+        lo, _, med, _, hi = futu
+        ax.plot(mpl_dates_futu[1:], med, color=color, linewidth=3, label=legend)
         ax.fill_between(
-            mpl_dates_fut[1:],
-            percentiles[0],
-            percentiles[1],
+            mpl_dates_futu[1:],
+            lo,
+            hi,
             alpha=0.15,
             color=color,
             lw=0,
+            rasterized=rasterize_bands,
         )
 
     ax.set_xlabel("Date")
@@ -354,18 +420,12 @@ def create_figure_0(save_to=None):
     ax.locator_params(axis="y", nbins=4)
     func_format = lambda num, _: "${:.0f}\,$k".format(num / 1_000)
     ax.yaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(func_format))
-    ax.xaxis.set_major_locator(
-        matplotlib.dates.WeekdayLocator(byweekday=matplotlib.dates.SU)
-    )
-    ax.xaxis.set_minor_locator(matplotlib.dates.DayLocator())
-    ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%m/%d"))
+    format_date_xticks(ax)
     ax.set_xlim(start_date, end_date)
     ax.xaxis.set_ticks_position("both")
 
     # TOTAL CASES
     ax = axes[2]
-    time1 = np.arange(-len(cases_obs) + 2, 1)
-    mpl_dates = conv_time_to_mpl_dates(time1) + diff_data_sim + num_days_data
     ax.plot(
         mpl_dates,
         cases_obs[1:],
@@ -375,49 +435,35 @@ def create_figure_0(save_to=None):
         color="tab:blue",
         zorder=5,
     )
-    cum_cases = np.cumsum(new_cases_past, axis=1) + cases_obs[0]
-    percentiles = (
-        np.percentile(cum_cases, q=2.5, axis=0),
-        np.percentile(cum_cases, q=97.5, axis=0),
-    )
-    ax.plot(
+    # the cumulative cases start with the first data point, skip it
+    _, _, cum_c_past, _ = _prepare(trace)
+    lo, _, med, _, hi = _cached(trace, "cum_past", lambda: _summarize(cum_c_past))
+    ax.plot(mpl_dates, med[1:], color="tab:green", linewidth=3, zorder=0)
+    ax.fill_between(
         mpl_dates,
-        np.median(cum_cases, axis=0),
+        lo[1:],
+        hi[1:],
+        alpha=0.3,
         color="tab:green",
-        linewidth=3,
-        zorder=0,
-    )
-    ax.fill_between(
-        mpl_dates, percentiles[0], percentiles[1], alpha=0.3, color="tab:green", lw=0,
+        lw=0,
+        rasterized=rasterize_bands,
     )
     ax.plot([], [], label=legends[0], alpha=0)
 
-    for trace_scen, color, legend in zip(posterior, colors, legends[1:]):
-        new_cases_past = trace_scen.new_cases[:, :num_days_data]
-        cum_cases = np.cumsum(new_cases_past, axis=1) + cases_obs[0]
-        ax.plot(
-            mpl_dates, np.median(cum_cases, axis=0), "--", color=color, linewidth=1.5
-        )
-
-        time2 = np.arange(0, num_days_future + 1)
-        mpl_dates_fut = conv_time_to_mpl_dates(time2) + diff_data_sim + num_days_data
-        cases_futu = (
-            np.cumsum(trace_scen["new_cases"][:, num_days_data:].T, axis=0)
-            + cases_obs[-1]
-        )
-        median = np.median(cases_futu, axis=-1)
-        percentiles = (
-            np.percentile(cases_futu, q=2.5, axis=-1),
-            np.percentile(cases_futu, q=97.5, axis=-1),
-        )
-        ax.plot(mpl_dates_fut[1:], median, color=color, linewidth=3, label=legend)
+    cum_past = _summarize_all(posterior, "cum_past", lambda t: _prepare(t)[2])
+    cum_futu = _summarize_all(posterior, "cum_futu", lambda t: _prepare(t)[3])
+    for past, futu, color, legend in zip(cum_past, cum_futu, colors, legends[1:]):
+        ax.plot(mpl_dates, past[2][1:], "--", color=color, linewidth=1.5)
+        lo, _, med, _, hi = futu
+        ax.plot(mpl_dates_futu[1:], med[1:], color=color, linewidth=3, label=legend)
         ax.fill_between(
-            mpl_dates_fut[1:],
-            percentiles[0],
-            percentiles[1],
+            mpl_dates_futu[1:],
+            lo[1:],
+            hi[1:],
             alpha=0.15,
             color=color,
             lw=0,
+            rasterized=rasterize_bands,
         )
 
     ax.set_xlabel("Date")
@@ -428,38 +474,37 @@ def create_figure_0(save_to=None):
     ax.locator_params(axis="y", nbins=4)
     func_format = lambda num, _: "${:.0f}\,$k".format(num / 1_000)
     ax.yaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(func_format))
-    ax.set_xlim(start_date, end_date)
-    ax.xaxis.set_major_locator(
-        matplotlib.dates.WeekdayLocator(byweekday=matplotlib.dates.SU)
-    )
-    ax.xaxis.set_minor_locator(matplotlib.dates.DayLocator())
-    ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%m/%d"))
+    format_date_xticks(ax)
     ax.set_xlim(start_date, end_date)
 
     # LAMBDA
     ax = axes[0]
-    time = np.arange(-diff_to_0 + 1, -diff_to_0 + num_days_sim + 1)
-
-    for trace_scen, color in zip(posterior, colors):
-        lambda_t = trace_scen["lambda_t"][:, :]
-        mu = trace_scen["mu"][:, None]
-        mpl_dates = conv_time_to_mpl_dates(time) + diff_data_sim + num_days_data
+    mpl_dates_sim = mpl_date_data_end + np.arange(
+        -diff_to_0 + 1, -diff_to_0 + num_days_sim + 1
+    )
 
-        ax.plot(mpl_dates, np.median(lambda_t - mu, axis=0), color=color, linewidth=2)
+    lambdas = _summarize_all(
+        posterior,
+        "lambda",
+        lambda t: _plot_samples(t, "lambda_t") - _plot_samples(t, "mu")[:, None],
+    )
+    for (lo, _, med, _, hi), color in zip(lambdas, colors):
+        ax.plot(mpl_dates_sim, med, color=color, linewidth=2)
         ax.fill_between(
-            mpl_dates,
-            np.percentile(lambda_t - mu, q=2.5, axis=0),
-            np.percentile(lambda_t - mu, q=97.5, axis=0),
+            mpl_dates_sim,
+            lo,
+            hi,
             alpha=0.15,
             color=color,
             lw=0,
+            rasterized=rasterize_bands,
         )
 
     ax.set_ylabel("Effective\ngrowth rate $\lambda_t^*$")
     ax.text(pos_letter[0], pos_letter[1], "A", transform=ax.transAxes, size=20)
     ax.set_ylim(-0.15, 0.45)
     ax.hlines(0, start_date, end_date, linestyles=":")
-    delay = matplotlib.dates.date2num(date_data_end) - np.percentile(trace.delay, q=75)
+    delay = mpl_date_data_end - np.percentile(trace.delay, q=75)
     ax.vlines(delay, -10, 10, linestyles="-", colors=["tab:red"])
     ax.text(
         delay + 0.4,
@@ -476,11 +521,7 @@ def create_figure_0(save_to=None):
         horizontalalignment="right",
         verticalalignment="top",
     )
-    ax.xaxis.set_major_locator(
-        matplotlib.dates.WeekdayLocator(byweekday=matplotlib.dates.SU)
-    )
-    ax.xaxis.set_minor_locator(matplotlib.dates.DayLocator())
-    ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%m/%d"))
+    format_date_xticks(ax)
     ax.set_xlim(start_date, end_date)
     ax.xaxis.set_ticks_position("both")
 
@@ -493,12 +534,8 @@ def create_figure_0(save_to=None):
     fig.subplots_adjust(hspace=-0.90)
     fig.tight_layout()
 
-    for ax in axes:
-        ax.set_rasterization_zorder(rasterization_zorder)
-
     if save_to is not None:
-        fig.savefig(save_to + "Fig_summary_forecast.pdf", dpi=300)
-        fig.savefig(save_to + "Fig_summary_forecast.png", dpi=300)
+        save_figure(fig, save_to + "Fig_summary_forecast")
 
     return figs
 
@@ -523,16 +560,12 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     cum_c_insetylim = [50, 250_000]
 
     # interval for the plots with forecast
-    start_date = conv_time_to_mpl_dates(-len(cases_obs) + 2) + diff_to_0
-    end_date = conv_time_to_mpl_dates(num_days_fut_to_plot) + diff_to_0
-    mid_date = conv_time_to_mpl_dates(1) + diff_to_0
-
-    # x-axis for dates, new_cases are one element shorter than cum_cases, use [1:]
-    # 0 is the last recorded data point
-    time_past = np.arange(-len(cases_obs) + 1, 1)
-    time_futu = np.arange(0, num_days_fut_to_plot + 1)
-    mpl_dates_past = conv_time_to_mpl_dates(time_past) + diff_to_0
-    mpl_dates_futu = conv_time_to_mpl_dates(time_futu) + diff_to_0
+    start_date = mpl_dates_past[1]
+    end_date = mpl_date_data_end + num_days_fut_to_plot
+    mid_date = mpl_date_data_end + 1
+
+    # x-axis for the forecast, shorter than the module wide `mpl_dates_futu`
+    mpl_dates_futu = mpl_date_data_end + np.arange(0, num_days_fut_to_plot + 1)
     fig, axes = plt.subplots(
         3, 1, figsize=figsize, gridspec_kw={"height_ratios": [2, 3, 3]},
         constrained_layout=True
@@ -546,41 +579,51 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     cum_c_obsd = cases_obs
 
     # model traces, dims: [sample, day],
-    new_c_past = trace["new_cases"][:, :num_days_data]
-    new_c_futu = trace["new_cases"][:, num_days_data:num_days_data+num_days_fut_to_plot]
-    cum_c_past = (
-            np.cumsum(np.insert(new_c_past, 0, 0, axis=1), axis=1) + cases_obs[0]
+    new_c_past, new_c_futu, cum_c_past, cum_c_futu = _prepare(trace)
+
+    # median, 75% and 95% CI along the sample axis. quantiles are computed per
+    # day, so those of the whole forecast can be cut to the plotted days
+    n = num_days_fut_to_plot
+    new_c_past_lo, _, new_c_past_md, _, new_c_past_hi = _cached(
+        trace, "new_past", lambda: _summarize(new_c_past)
+    )
+    new_c_futu_lo, new_c_futu_lo75, new_c_futu_md, new_c_futu_hi75, new_c_futu_hi = (
+        _cached(trace, "new_futu", lambda: _summarize(new_c_futu))[:, :n]
     )
-    cum_c_futu = (
-            np.cumsum(np.insert(new_c_futu, 0, 0, axis=1), axis=1) + cases_obs[-1]
+    cum_c_past_lo, _, cum_c_past_md, _, cum_c_past_hi = _cached(
+        trace, "cum_past", lambda: _summarize(cum_c_past)
+    )
+    cum_c_futu_lo, cum_c_futu_lo75, cum_c_futu_md, cum_c_futu_hi75, cum_c_futu_hi = (
+        _cached(trace, "cum_futu", lambda: _summarize(cum_c_futu))[:, : n + 1]
     )
 
     # --------------------------------------------------------------------------- #
     # growth rate lambda*
     # --------------------------------------------------------------------------- #
     ax = axes[0]
-    mu = trace["mu"][:, np.newaxis]
-    lambda_t = trace["lambda_t"][:, diff_data_sim:diff_data_sim+num_days_data+num_days_fut_to_plot]
+    mu = _plot_samples(trace, "mu")[:, np.newaxis]
+    lambda_t = _plot_samples(trace, "lambda_t")
+    lo, _, med, _, hi = _cached(trace, "lambda", lambda: _summarize(lambda_t - mu))
+    days = slice(diff_data_sim, diff_data_sim + num_days_data + n)
     ax.plot(
         np.concatenate([mpl_dates_past[1:], mpl_dates_futu[1:]]),
-        np.median(lambda_t - mu, axis=0),
+        med[days],
         color=color,
         linewidth=2,
     )
     ax.fill_between(
         np.concatenate([mpl_dates_past[1:], mpl_dates_futu[1:]]),
-        np.percentile(lambda_t - mu, q=2.5, axis=0),
-        np.percentile(lambda_t - mu, q=97.5, axis=0),
+        lo[days],
+        hi[days],
         alpha=0.15,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     ax.set_ylabel(ylabel_lam)
     ax.set_ylim(*y_lim_lambda)
     ax.hlines(0, start_date, end_date, linestyles=":")
-    delay = matplotlib.dates.date2num(date_data_end) - np.percentile(
-        trace.delay, q=75
-    )
+    delay = mpl_date_data_end - np.percentile(trace.delay, q=75)
     if plot_red_axis:
         ax.vlines(delay, -10, 10, linestyles="-", colors=["tab:red"])
         ax.text(
@@ -621,7 +664,7 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.plot(
         mpl_dates_past[1:],
-        np.median(new_c_past, axis=0),
+        new_c_past_md,
         "-",
         color=color,
         linewidth=1.5,
@@ -630,15 +673,16 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.fill_between(
         mpl_dates_past[1:],
-        np.percentile(new_c_past, q=2.5, axis=0),
-        np.percentile(new_c_past, q=97.5, axis=0),
+        new_c_past_lo,
+        new_c_past_hi,
         alpha=0.1,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     ax.plot(
         mpl_dates_futu[1:],
-        np.median(new_c_futu, axis=0),
+        new_c_futu_md,
         "--",
         color=color,
         linewidth=3,
@@ -646,19 +690,21 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.fill_between(
         mpl_dates_futu[1:],
-        np.percentile(new_c_futu, q=2.5, axis=0),
-        np.percentile(new_c_futu, q=97.5, axis=0),
+        new_c_futu_lo,
+        new_c_futu_hi,
         alpha=0.1,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     ax.fill_between(
         mpl_dates_futu[1:],
-        np.percentile(new_c_futu, q=12.5, axis=0),
-        np.percentile(new_c_futu, q=87.5, axis=0),
+        new_c_futu_lo75,
+        new_c_futu_hi75,
         alpha=0.2,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     ax.set_ylabel(ylabel_new)
     ax.legend(loc=leg_loc)
@@ -685,7 +731,7 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.plot(
         mpl_dates_past[1:],
-        np.median(new_c_past, axis=0),
+        new_c_past_md,
         "-",
         color=color,
         label="Fit (with 95% CI)",
@@ -693,11 +739,12 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.fill_between(
         mpl_dates_past[1:],
-        np.percentile(new_c_past, q=2.5, axis=0),
-        np.percentile(new_c_past, q=97.5, axis=0),
+        new_c_past_lo,
+        new_c_past_hi,
         alpha=0.1,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     format_date_xticks(ax, minor=True)
     ax.set_yscale("log")
@@ -723,7 +770,7 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.plot(
         mpl_dates_past[:],
-        np.median(cum_c_past, axis=0),
+        cum_c_past_md,
         "-",
         color=color,
         linewidth=1.5,
@@ -732,15 +779,16 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.fill_between(
         mpl_dates_past[:],
-        np.percentile(cum_c_past, q=2.5, axis=0),
-        np.percentile(cum_c_past, q=97.5, axis=0),
+        cum_c_past_lo,
+        cum_c_past_hi,
         alpha=0.1,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     ax.plot(
         mpl_dates_futu[1:],
-        np.median(cum_c_futu[:, 1:], axis=0),
+        cum_c_futu_md[1:],
         "--",
         color=color,
         linewidth=3,
@@ -748,19 +796,21 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.fill_between(
         mpl_dates_futu[1:],
-        np.percentile(cum_c_futu[:, 1:], q=2.5, axis=0),
-        np.percentile(cum_c_futu[:, 1:], q=97.5, axis=0),
+        cum_c_futu_lo[1:],
+        cum_c_futu_hi[1:],
         alpha=0.1,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     ax.fill_between(
         mpl_dates_futu[1:],
-        np.percentile(cum_c_futu[:, 1:], q=12.5, axis=0),
-        np.percentile(cum_c_futu[:, 1:], q=87.5, axis=0),
+        cum_c_futu_lo75[1:],
+        cum_c_futu_hi75[1:],
         alpha=0.2,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     ax.set_xlabel("Date")
     ax.set_ylabel(ylabel_cum)
@@ -785,7 +835,7 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.plot(
         mpl_dates_past[:],
-        np.median(cum_c_past, axis=0),
+        cum_c_past_md,
         "-",
         color=color,
         label="Fit (with 95% CI)",
@@ -793,11 +843,12 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     )
     ax.fill_between(
         mpl_dates_past[:],
-        np.percentile(cum_c_past, q=2.5, axis=0),
-        np.percentile(cum_c_past, q=97.5, axis=0),
+        cum_c_past_lo,
+        cum_c_past_hi,
         alpha=0.1,
         color=color,
         lw=0,
+        rasterized=rasterize_bands,
     )
     format_date_xticks(ax, minor=True)
     ax.set_yscale("log")
@@ -813,24 +864,12 @@ def create_figure_timeserie(trace, color='tab:green', save_to = None, num_days_f
     # --------------------------------------------------------------------------- #
 
     for ax in axes:
-        ax.set_rasterization_zorder(rasterization_zorder)
         ax.spines['right'].set_visible(False)
         ax.spines['top'].set_visible(False)
 
     # plt.subplots_adjust(wspace=0.4, hspace=0.25)
     if save_to is not None:
-        plt.savefig(
-            save_to + ".pdf",
-            dpi=300,
-            bbox_inches="tight",
-            pad_inches=0,
-        )
-        plt.savefig(
-            save_to + ".png",
-            dpi=300,
-            bbox_inches="tight",
-            pad_inches=0,
-        )
+        save_figure(fig, save_to, bbox_inches="tight", pad_inches=0)
 
 
 def create_figure_3_timeseries(save_to=None):
@@ -859,102 +898,135 @@ def create_figure_3_timeseries(save_to=None):
     cum_c_insetylim = [50, 250_000]
 
     # interval for the plots with forecast
-    start_date = conv_time_to_mpl_dates(-len(cases_obs) + 2) + diff_to_0
-    end_date = conv_time_to_mpl_dates(num_days_future - 10) + diff_to_0
-    mid_date = conv_time_to_mpl_dates(1) + diff_to_0
+    start_date = mpl_dates_past[1]
+    end_date = mpl_date_data_end + num_days_future - 10
+    mid_date = mpl_date_data_end + 1
 
-    # x-axis for dates, new_cases are one element shorter than cum_cases, use [1:]
-    # 0 is the last recorded data point
-    time_past = np.arange(-len(cases_obs) + 1, 1)
-    time_futu = np.arange(0, num_days_future + 1)
-    mpl_dates_past = conv_time_to_mpl_dates(time_past) + diff_to_0
-    mpl_dates_futu = conv_time_to_mpl_dates(time_futu) + diff_to_0
+    # observed data, only one dim: [day]
+    new_c_obsd = np.diff(cases_obs)
+    cum_c_obsd = cases_obs
 
+    # the axes look the same for all scenarios. when saving, the figure is set up
+    # once and only the artists of the scenario are replaced. it is closed after
+    # the last scenario and nothing is returned, the figures are in the saved files.
+    # without `save_to` every scenario gets its own figure, all of them are returned
     figs = []
+    artists = []
     for trace, color, save_name in zip(
         (traces[1:]),
         ("tab:red", "tab:orange", "tab:green"),
         ("Fig_S1", "Fig_3", "Fig_S3"),
     ):
-
-        fig, axes = plt.subplots(
-            3, 1, figsize=figsize, gridspec_kw={"height_ratios": [2, 3, 3]},
-            constrained_layout=True
-        )
-        figs.append(fig)
+        if not figs or save_to is None:
+            fig, axes, insets = _create_figure_3_axes(
+                figsize,
+                pos_letter,
+                titlesize,
+                insetsize,
+                start_date,
+                end_date,
+                mid_date,
+            )
+            figs.append(fig)
+
+            axes[0].set_ylabel(ylabel_lam)
+            axes[0].set_ylim(-0.15, 0.45)
+            axes[0].hlines(0, start_date, end_date, linestyles=":")
+
+            axes[1].set_ylabel(ylabel_new)
+            axes[1].set_ylim(new_c_ylim)
+            insets[0].set_yticks([1e1, 1e2, 1e3, 1e4, 1e5])
+            insets[0].set_ylim(new_c_insetylim)
+
+            axes[2].set_xlabel("Date")
+            axes[2].set_ylabel(ylabel_cum)
+            axes[2].set_ylim(cum_c_ylim)
+            insets[1].set_yticks([1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7])
+            insets[1].set_ylim(cum_c_insetylim)
+        else:
+            for artist in artists:
+                artist.remove()
+        artists = []
 
         # --------------------------------------------------------------------------- #
         # prepare data
         # --------------------------------------------------------------------------- #
-        # observed data, only one dim: [day]
-        new_c_obsd = np.diff(cases_obs)
-        cum_c_obsd = cases_obs
-
         # model traces, dims: [sample, day],
-        new_c_past = trace["new_cases"][:, :num_days_data]
-        new_c_futu = trace["new_cases"][:, num_days_data:]
-        cum_c_past = (
-            np.cumsum(np.insert(new_c_past, 0, 0, axis=1), axis=1) + cases_obs[0]
+        new_c_past, new_c_futu, cum_c_past, cum_c_futu = _prepare(trace)
+
+        # median, 75% and 95% CI along the sample axis, shared with `create_figure_0`
+        new_c_past_lo, _, new_c_past_md, _, new_c_past_hi = _cached(
+            trace, "new_past", lambda: _summarize(new_c_past)
         )
-        cum_c_futu = (
-            np.cumsum(np.insert(new_c_futu, 0, 0, axis=1), axis=1) + cases_obs[-1]
+        (
+            new_c_futu_lo,
+            new_c_futu_lo75,
+            new_c_futu_md,
+            new_c_futu_hi75,
+            new_c_futu_hi,
+        ) = _cached(trace, "new_futu", lambda: _summarize(new_c_futu))
+        cum_c_past_lo, _, cum_c_past_md, _, cum_c_past_hi = _cached(
+            trace, "cum_past", lambda: _summarize(cum_c_past)
         )
+        (
+            cum_c_futu_lo,
+            cum_c_futu_lo75,
+            cum_c_futu_md,
+            cum_c_futu_hi75,
+            cum_c_futu_hi,
+        ) = _cached(trace, "cum_futu", lambda: _summarize(cum_c_futu))
 
         # --------------------------------------------------------------------------- #
         # growth rate lambda*
         # --------------------------------------------------------------------------- #
         ax = axes[0]
-        mu = trace["mu"][:, np.newaxis]
-        lambda_t = trace["lambda_t"][:, diff_data_sim:]
-        ax.plot(
+        mu = _plot_samples(trace, "mu")[:, np.newaxis]
+        lambda_t = _plot_samples(trace, "lambda_t")
+        lo, _, med, _, hi = _cached(trace, "lambda", lambda: _summarize(lambda_t - mu))
+        artists += ax.plot(
             np.concatenate([mpl_dates_past[1:], mpl_dates_futu[1:]]),
-            np.median(lambda_t - mu, axis=0),
+            med[diff_data_sim:],
             color=color,
             linewidth=2,
         )
-        ax.fill_between(
-            np.concatenate([mpl_dates_past[1:], mpl_dates_futu[1:]]),
-            np.percentile(lambda_t - mu, q=2.5, axis=0),
-            np.percentile(lambda_t - mu, q=97.5, axis=0),
-            alpha=0.15,
-            color=color,
-            lw=0,
-        )
-        ax.set_ylabel(ylabel_lam)
-        ax.set_ylim(-0.15, 0.45)
-        ax.hlines(0, start_date, end_date, linestyles=":")
-        delay = matplotlib.dates.date2num(date_data_end) - np.percentile(
-            trace.delay, q=75
-        )
-        ax.vlines(delay, -10, 10, linestyles="-", colors=["tab:red"])
-        ax.text(
-            delay + 1.5,
-            0.4,
-            "unconstrained due\nto reporting delay",
-            color="tab:red",
-            verticalalignment="top",
+        artists.append(
+            ax.fill_between(
+                np.concatenate([mpl_dates_past[1:], mpl_dates_futu[1:]]),
+                lo[diff_data_sim:],
+                hi[diff_data_sim:],
+                alpha=0.15,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        ax.text(
-            delay - 1.5,
-            0.4,
-            "constrained\nby data",
-            color="tab:red",
-            horizontalalignment="right",
-            verticalalignment="top",
+        delay = mpl_date_data_end - np.percentile(trace.delay, q=75)
+        artists.append(ax.vlines(delay, -10, 10, linestyles="-", colors=["tab:red"]))
+        artists.append(
+            ax.text(
+                delay + 1.5,
+                0.4,
+                "unconstrained due\nto reporting delay",
+                color="tab:red",
+                verticalalignment="top",
+            )
         )
-        ax.text(
-            pos_letter[0], pos_letter[1], "A", transform=ax.transAxes, size=titlesize
+        artists.append(
+            ax.text(
+                delay - 1.5,
+                0.4,
+                "constrained\nby data",
+                color="tab:red",
+                horizontalalignment="right",
+                verticalalignment="top",
+            )
         )
-        ax.set_xlim(start_date, end_date)
-        format_date_xticks(ax)
-        for label in ax.xaxis.get_ticklabels()[1::2]:
-            label.set_visible(False)
 
         # --------------------------------------------------------------------------- #
         # New cases, lin scale first
         # --------------------------------------------------------------------------- #
         ax = axes[1]
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_past[1:],
             new_c_obsd,
             "d",
@@ -963,100 +1035,97 @@ def create_figure_3_timeseries(save_to=None):
             color="tab:blue",
             zorder=5,
         )
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_past[1:],
-            np.median(new_c_past, axis=0),
+            new_c_past_md,
             "-",
             color=color,
             linewidth=1.5,
             label="Fit",
             zorder=10,
         )
-        ax.fill_between(
-            mpl_dates_past[1:],
-            np.percentile(new_c_past, q=2.5, axis=0),
-            np.percentile(new_c_past, q=97.5, axis=0),
-            alpha=0.1,
-            color=color,
-            lw=0,
+        artists.append(
+            ax.fill_between(
+                mpl_dates_past[1:],
+                new_c_past_lo,
+                new_c_past_hi,
+                alpha=0.1,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_futu[1:],
-            np.median(new_c_futu, axis=0),
+            new_c_futu_md,
             "--",
             color=color,
             linewidth=3,
             label="Forecast",
         )
-        ax.fill_between(
-            mpl_dates_futu[1:],
-            np.percentile(new_c_futu, q=2.5, axis=0),
-            np.percentile(new_c_futu, q=97.5, axis=0),
-            alpha=0.1,
-            color=color,
-            lw=0,
+        artists.append(
+            ax.fill_between(
+                mpl_dates_futu[1:],
+                new_c_futu_lo,
+                new_c_futu_hi,
+                alpha=0.1,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        ax.fill_between(
-            mpl_dates_futu[1:],
-            np.percentile(new_c_futu, q=12.5, axis=0),
-            np.percentile(new_c_futu, q=87.5, axis=0),
-            alpha=0.2,
-            color=color,
-            lw=0,
+        artists.append(
+            ax.fill_between(
+                mpl_dates_futu[1:],
+                new_c_futu_lo75,
+                new_c_futu_hi75,
+                alpha=0.2,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        ax.set_ylabel(ylabel_new)
         ax.legend(loc=leg_loc)
         ax.get_legend().get_frame().set_linewidth(0.0)
         ax.get_legend().get_frame().set_facecolor("#F0F0F0")
-        ax.set_ylim(new_c_ylim)
-        ax.set_xlim(start_date, end_date)
-        ax.text(
-            pos_letter[0], pos_letter[1], "B", transform=ax.transAxes, size=titlesize
-        )
-
-        ax.set_xlim(start_date, end_date)
-        format_date_xticks(ax)
-        ax.yaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(format_k))
-        for label in ax.xaxis.get_ticklabels()[1::2]:
-            label.set_visible(False)
 
-        # NEW CASES LOG SCALE, skip forecast
-        ax = inset_axes(
-            ax, width=insetsize[0], height=insetsize[1], loc=2, borderpad=0.75
-        )
-        ax.plot(
-            mpl_dates_past[1:], new_c_obsd, "d", markersize=2, label="Data", zorder=5
+        # NEW CASES LOG SCALE, skip forecast. the colors are explicit, the color
+        # cycle of a reused figure continues where the last scenario stopped
+        ax = insets[0]
+        artists += ax.plot(
+            mpl_dates_past[1:],
+            new_c_obsd,
+            "d",
+            markersize=2,
+            color="tab:blue",
+            label="Data",
+            zorder=5,
         )
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_past[1:],
-            np.median(new_c_past, axis=0),
+            new_c_past_md,
             "-",
             color=color,
             label="Fit (with 95% CI)",
             zorder=10,
         )
-        ax.fill_between(
-            mpl_dates_past[1:],
-            np.percentile(new_c_past, q=2.5, axis=0),
-            np.percentile(new_c_past, q=97.5, axis=0),
-            alpha=0.1,
-            color=color,
-            lw=0,
+        artists.append(
+            ax.fill_between(
+                mpl_dates_past[1:],
+                new_c_past_lo,
+                new_c_past_hi,
+                alpha=0.1,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        format_date_xticks(ax, minor=True)
-        ax.set_yscale("log")
-        ax.set_yticks([1e1, 1e2, 1e3, 1e4, 1e5])
-        ax.set_xlim(start_date, mid_date)
-        ax.set_ylim(new_c_insetylim)
-        ax.yaxis.tick_right()
-        for label in ax.xaxis.get_ticklabels()[1:-1]:
-            label.set_visible(False)
 
         # --------------------------------------------------------------------------- #
         # Total cases, lin scale first
         # --------------------------------------------------------------------------- #
         ax = axes[2]
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_past[:],
             cum_c_obsd,
             "d",
@@ -1065,143 +1134,161 @@ def create_figure_3_timeseries(save_to=None):
             color="tab:blue",
             zorder=5,
         )
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_past[:],
-            np.median(cum_c_past, axis=0),
+            cum_c_past_md,
             "-",
             color=color,
             linewidth=1.5,
             label="Fit with 95% CI",
             zorder=10,
         )
-        ax.fill_between(
-            mpl_dates_past[:],
-            np.percentile(cum_c_past, q=2.5, axis=0),
-            np.percentile(cum_c_past, q=97.5, axis=0),
-            alpha=0.1,
-            color=color,
-            lw=0,
+        artists.append(
+            ax.fill_between(
+                mpl_dates_past[:],
+                cum_c_past_lo,
+                cum_c_past_hi,
+                alpha=0.1,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_futu[1:],
-            np.median(cum_c_futu[:, 1:], axis=0),
+            cum_c_futu_md[1:],
             "--",
             color=color,
             linewidth=3,
             label="Forecast with 75% and 95% CI",
         )
-        ax.fill_between(
-            mpl_dates_futu[1:],
-            np.percentile(cum_c_futu[:, 1:], q=2.5, axis=0),
-            np.percentile(cum_c_futu[:, 1:], q=97.5, axis=0),
-            alpha=0.1,
-            color=color,
-            lw=0,
-        )
-        ax.fill_between(
-            mpl_dates_futu[1:],
-            np.percentile(cum_c_futu[:, 1:], q=12.5, axis=0),
-            np.percentile(cum_c_futu[:, 1:], q=87.5, axis=0),
-            alpha=0.2,
-            color=color,
-            lw=0,
+        artists.append(
+            ax.fill_between(
+                mpl_dates_futu[1:],
+                cum_c_futu_lo[1:],
+                cum_c_futu_hi[1:],
+                alpha=0.1,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        ax.set_xlabel("Date")
-        ax.set_ylabel(ylabel_cum)
-        ax.set_ylim(cum_c_ylim)
-        ax.set_xlim(start_date, end_date)
-        ax.text(
-            pos_letter[0], pos_letter[1], "C", transform=ax.transAxes, size=titlesize
+        artists.append(
+            ax.fill_between(
+                mpl_dates_futu[1:],
+                cum_c_futu_lo75[1:],
+                cum_c_futu_hi75[1:],
+                alpha=0.2,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
 
-        ax.set_xlim(start_date, end_date)
-        format_date_xticks(ax)
-        ax.yaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(format_k))
-        for label in ax.xaxis.get_ticklabels()[1::2]:
-            label.set_visible(False)
-
         # Total CASES LOG SCALE, skip forecast
-        ax = inset_axes(
-            ax, width=insetsize[0], height=insetsize[1], loc=2, borderpad=0.75
-        )
-        ax.plot(
-            mpl_dates_past[:], cum_c_obsd, "d", markersize=2, label="Data", zorder=5
+        ax = insets[1]
+        artists += ax.plot(
+            mpl_dates_past[:],
+            cum_c_obsd,
+            "d",
+            markersize=2,
+            color="tab:blue",
+            label="Data",
+            zorder=5,
         )
-        ax.plot(
+        artists += ax.plot(
             mpl_dates_past[:],
-            np.median(cum_c_past, axis=0),
+            cum_c_past_md,
             "-",
             color=color,
             label="Fit (with 95% CI)",
             zorder=10,
         )
-        ax.fill_between(
-            mpl_dates_past[:],
-            np.percentile(cum_c_past, q=2.5, axis=0),
-            np.percentile(cum_c_past, q=97.5, axis=0),
-            alpha=0.1,
-            color=color,
-            lw=0,
+        artists.append(
+            ax.fill_between(
+                mpl_dates_past[:],
+                cum_c_past_lo,
+                cum_c_past_hi,
+                alpha=0.1,
+                color=color,
+                lw=0,
+                rasterized=rasterize_bands,
+            )
         )
-        format_date_xticks(ax, minor=True)
-        ax.set_yscale("log")
-        ax.set_yticks([1e1, 1e2, 1e3, 1e4, 1e5, 1e6, 1e7])
-        ax.set_xlim(start_date, mid_date)
-        ax.set_ylim(cum_c_insetylim)
-        ax.yaxis.tick_right()
-        for label in ax.xaxis.get_ticklabels()[1:-1]:
-            label.set_visible(False)
-
-        # --------------------------------------------------------------------------- #
-        # Finalize
-        # --------------------------------------------------------------------------- #
-
-        for ax in axes:
-            ax.set_rasterization_zorder(rasterization_zorder)
-            ax.spines['right'].set_visible(False)
-            ax.spines['top'].set_visible(False)
 
         # plt.subplots_adjust(wspace=0.4, hspace=0.25)
         if save_to is not None:
-            plt.savefig(
-                save_to + save_name + ".pdf",
-                dpi=300,
-                bbox_inches="tight",
-                pad_inches=0,
-            )
-            plt.savefig(
-                save_to + save_name + ".png",
-                dpi=300,
-                bbox_inches="tight",
-                pad_inches=0,
-            )
+            save_figure(fig, save_to + save_name, bbox_inches="tight", pad_inches=0)
 
+    if save_to is not None:
+        plt.close(fig)
+        return None
     return figs
 
 
+# the three panels of `create_figure_3_timeseries` with the insets of the new and
+# total cases, without data. the limits of the y axes are left to the caller
+def _create_figure_3_axes(
+    figsize, pos_letter, titlesize, insetsize, start_date, end_date, mid_date
+):
+    fig, axes = plt.subplots(
+        3,
+        1,
+        figsize=figsize,
+        gridspec_kw={"height_ratios": [2, 3, 3]},
+        constrained_layout=True,
+    )
+
+    for ax, letter in zip(axes, "ABC"):
+        ax.text(*pos_letter, letter, transform=ax.transAxes, size=titlesize)
+        ax.set_xlim(start_date, end_date)
+        fix_date_xticks(ax)
+        if letter != "A":
+            ax.yaxis.set_major_formatter(matplotlib.ticker.FuncFormatter(format_k))
+        for label in ax.xaxis.get_ticklabels()[1::2]:
+            label.set_visible(False)
+        ax.spines["right"].set_visible(False)
+        ax.spines["top"].set_visible(False)
+
+    insets = []
+    for ax in axes[1:]:
+        ax = inset_axes(
+            ax, width=insetsize[0], height=insetsize[1], loc=2, borderpad=0.75
+        )
+        ax.set_yscale("log")
+        ax.set_xlim(start_date, mid_date)
+        fix_date_xticks(ax, minor=True)
+        ax.yaxis.tick_right()
+        for label in ax.xaxis.get_ticklabels()[1:-1]:
+            label.set_visible(False)
+        insets.append(ax)
+
+    return fig, axes, insets
+
 
 def get_priors_dict():
+    # frozen distributions, their parameters are only checked once
     pr = dict()
-    pr["lambda_0"] = lambda x: scipy.stats.lognorm.pdf(x, scale=0.4, s=0.5)
-    pr["lambda_1"] = lambda x: scipy.stats.lognorm.pdf(x, scale=0.2, s=0.5)
-    pr["lambda_2"] = lambda x: scipy.stats.lognorm.pdf(x, scale=1 / 8, s=0.5)
-    pr["lambda_3"] = lambda x: scipy.stats.lognorm.pdf(x, scale=1 / 8 / 2, s=0.5)
-    pr["transient_begin_0"] = lambda x: scipy.stats.norm.pdf(
-        x, loc=matplotlib.dates.date2num([prior_date_mild_dist_begin])[0], scale=3
-    )
-    pr["transient_begin_1"] = lambda x: scipy.stats.norm.pdf(
-        x, loc=matplotlib.dates.date2num([prior_date_strong_dist_begin])[0], scale=1
-    )
-    pr["transient_begin_2"] = lambda x: scipy.stats.norm.pdf(
-        x, loc=matplotlib.dates.date2num([prior_date_contact_ban_begin])[0], scale=1
-    )
-    pr["transient_len_0"] = lambda x: scipy.stats.lognorm.pdf(x, scale=3, s=0.3)
-    pr["transient_len_1"] = lambda x: scipy.stats.lognorm.pdf(x, scale=3, s=0.3)
-    pr["transient_len_2"] = lambda x: scipy.stats.lognorm.pdf(x, scale=3, s=0.3)
-    pr["mu"] = lambda x: scipy.stats.lognorm.pdf(x, scale=1 / 8, s=0.2)
-    pr["delay"] = lambda x: scipy.stats.lognorm.pdf(x, scale=8, s=0.2)
-    pr["I_begin"] = lambda x: scipy.stats.halfcauchy.pdf(x, scale=100)
-    pr["sigma_obs"] = lambda x: scipy.stats.halfcauchy.pdf(x, scale=10)
+    pr["lambda_0"] = scipy.stats.lognorm(scale=0.4, s=0.5).pdf
+    pr["lambda_1"] = scipy.stats.lognorm(scale=0.2, s=0.5).pdf
+    pr["lambda_2"] = scipy.stats.lognorm(scale=1 / 8, s=0.5).pdf
+    pr["lambda_3"] = scipy.stats.lognorm(scale=1 / 8 / 2, s=0.5).pdf
+    pr["transient_begin_0"] = scipy.stats.norm(
+        loc=mpl_prior_date_mild_dist_begin, scale=3
+    ).pdf
+    pr["transient_begin_1"] = scipy.stats.norm(
+        loc=mpl_prior_date_strong_dist_begin, scale=1
+    ).pdf
+    pr["transient_begin_2"] = scipy.stats.norm(
+        loc=mpl_prior_date_contact_ban_begin, scale=1
+    ).pdf
+    pr["transient_len_0"] = scipy.stats.lognorm(scale=3, s=0.3).pdf
+    pr["transient_len_1"] = scipy.stats.lognorm(scale=3, s=0.3).pdf
+    pr["transient_len_2"] = scipy.stats.lognorm(scale=3, s=0.3).pdf
+    pr["mu"] = scipy.stats.lognorm(scale=1 / 8, s=0.2).pdf
+    pr["delay"] = scipy.stats.lognorm(scale=8, s=0.2).pdf
+    pr["I_begin"] = scipy.stats.halfcauchy(scale=100).pdf
+    pr["sigma_obs"] = scipy.stats.halfcauchy(scale=10).pdf
     return pr
 
 
@@ -1395,6 +1482,9 @@ def create_figure_3_distributions(model, trace, save_to=None, layout=2,
         axpos[key].xaxis.set_label_position("top")
 
     # render panels
+    mu_median = np.median(trace["mu"])
+    # the growth rates share their x limits and with them the grid of the priors
+    x_lambda_panels = np.linspace(*xlim_lambda, num=100)
     for key in axpos.keys():
         if "legend" in key:
             continue
@@ -1416,33 +1506,31 @@ def create_figure_3_distributions(model, trace, save_to=None, layout=2,
         ):
             ax.set_xlabel(labels[key], fontweight="bold")
 
-        # posteriors
-        ax.hist(
-            data,
-            bins=50,
-            density=True,
-            color=colors[1],
-            label="Posterior",
-            alpha=0.7,
-            zorder=-5,
+        # posteriors, the histograms are kept for further figures of the trace
+        counts, edges = _cached(
+            trace, "hist_" + key, lambda: histogram(data, bins=50, density=True)
         )
+        step_fill(ax, counts, edges, color=colors[1], label="Posterior", alpha=0.7)
 
         # xlim
         if "lambda" in key or "mu" == key:
             ax.set_xlim(xlim_lambda)
-            ax.axvline(np.median(trace["mu"]), ls=":", color="black")
+            ax.axvline(mu_median, ls=":", color="black")
         elif "I_begin" == key:
             ax.set_xlim(0)
         elif "transient_len" in key:
             ax.set_xlim(xlim_transt)
         elif name_trans_day in key:
-            md = np.median(data)
+            md = _median_CI(data)[1]
             ax.set_xlim([int(md) - xlim_tbegin, int(md) + xlim_tbegin - 1])
-            format_date_xticks(ax)
+            fix_date_xticks(ax)
 
         # priors
         limits = ax.get_xlim()
-        x = np.linspace(*limits, num=100)
+        if "lambda" in key or "mu" == key:
+            x = x_lambda_panels
+        else:
+            x = np.linspace(*limits, num=100)
         if 'transient_begin' in key:
             beg_x = matplotlib.dates.num2date(x[0])
             diff_dates_x = (beg_x.replace(tzinfo=None) - date_begin_sim).days
@@ -1485,7 +1573,7 @@ def create_figure_3_distributions(model, trace, save_to=None, layout=2,
             text = print_median_CI(data, prec=2)
         elif name_trans_day in key:
             text = print_median_CI(
-                data - matplotlib.dates.date2num(date_data_begin) + 1, prec=1
+                data - mpl_date_data_begin + 1, prec=1
             )
         else:
             text = print_median_CI(data, prec=1)
@@ -1511,25 +1599,15 @@ def create_figure_3_distributions(model, trace, save_to=None, layout=2,
                 # matplotlib.rcParams['text.usetex'] = True
                 # with rc_context(rc={'text.usetex': True}):
                 text = insets[key] + md + "$" + "\n" + r'$\,$'
-                ax.text(
-                    0.6, 0.9, text, fontsize=12, transform=ax.transAxes,
-                    verticalalignment="top",
-                    horizontalalignment="center",
-                    bbox=dict(facecolor="white", alpha=0.5, edgecolor="none"),
-                )
-                ax.text(
-                    0.6, 0.6, ci, fontsize=9, transform=ax.transAxes,
-                    verticalalignment="top",
-                    horizontalalignment="center",
-                    # bbox=dict(facecolor="white", alpha=0.5, edgecolor="none"),
-                ),
+                ax.text(0.6, 0.9, text, transform=ax.transAxes, **median_style)
+                ax.text(0.6, 0.6, ci, transform=ax.transAxes, **ci_style)
 
     # legend
     if 'legend' in axpos:
         ax = axpos["legend"]
         ax.set_axis_off()
         ax.plot([], [], color=colors[0], linewidth=3, label="Prior")
-        ax.hist([], color=colors[1], label="Posterior")
+        ax.fill_between([], [], color=colors[1], label="Posterior")
         ax.legend(loc="center left")
         ax.get_legend().get_frame().set_linewidth(0.0)
         ax.get_legend().get_frame().set_facecolor("#F0F0F0")
@@ -1545,15 +1623,13 @@ def create_figure_3_distributions(model, trace, save_to=None, layout=2,
                 ax.set_ylabel("Density")
             ax.tick_params(labelleft=False)
             ax.locator_params(nbins=4)
-            ax.set_rasterization_zorder(rasterization_zorder)
             ax.spines["right"].set_visible(False)
             ax.spines["top"].set_visible(False)
 
     # plt.subplots_adjust(wspace=0.2, hspace=0.9)
 
     if save_to is not None:
-        plt.savefig(save_to + ".pdf", bbox_inches="tight", pad_inches=0, dpi=300)
-        plt.savefig(save_to + ".png", bbox_inches="tight", pad_inches=0, dpi=300)
+        save_figure(fig, save_to, bbox_inches="tight", pad_inches=0)
 # ------------------------------------------------------------------------------ #
 # helper
 # ------------------------------------------------------------------------------ #
@@ -1561,7 +1637,65 @@ def create_figure_3_distributions(model, trace, save_to=None, layout=2,
 # format yaxis 10_000 as 10 k
 format_k = lambda num, _: "${:.0f}\,$k".format(num / 1_000)
 
+# draw a histogram as one filled step polygon instead of one rectangle per bin
+def step_hist(ax, data, bins=10, density=False, **kwargs):
+    counts, edges = histogram(data, bins=bins, density=density)
+    return step_fill(ax, counts, edges, **kwargs)
+
+
+# `np.histogram`, the density is normalized from the integer counts
+def histogram(data, bins=10, density=False):
+    counts, edges = np.histogram(data, bins=bins)
+    if density:
+        return counts / (counts.sum() * np.diff(edges)), edges
+    return counts, edges
+
+
+# draw a histogram from its `counts` and bin `edges`. `ax.stairs` is only
+# available from matplotlib 3.4 on, older versions fill between the steps
+def step_fill(ax, counts, edges, **kwargs):
+    if hasattr(ax, "stairs"):
+        poly = ax.stairs(counts, edges, fill=True, lw=0, **kwargs)
+    else:
+        poly = ax.fill_between(
+            edges, np.append(counts, counts[-1]), step="post", lw=0, **kwargs
+        )
+    # like `ax.hist`, do not add a margin below zero when autoscaling
+    poly.sticky_edges.y.append(0)
+    return poly
+
+
+# save `fig` to `path` + ".pdf" and ".png". the png is rendered from the pdf if
+# poppler is installed, drawing the figure a second time with agg takes longer
+def save_figure(fig, path, **kwargs):
+    fig.savefig(path + ".pdf", dpi=300, **kwargs)
+    if shutil.which("pdftoppm") is not None:
+        subprocess.run(
+            ["pdftoppm", "-r", "300", "-png", "-singlefile", path + ".pdf", path],
+            check=True,
+        )
+    else:
+        fig.savefig(path + ".png", dpi=300, **kwargs)
+
+
+# one panel of the distributions in figure 0, histogram of the posterior `samples`
+# with the `prior` over `x` and the median and CI as `text`. `x` spans the panel
+def _plot_distribution_panel(
+    ax, samples, bins, x, prior, xlabel, text, ylim, date_axis=False
+):
+    step_hist(ax, samples, bins=bins, **post_style)
+    ax.plot(x, prior, **prio_style)
+    ax.set_xlabel(xlabel)
+    ax.text(0.05, 0.95, text, transform=ax.transAxes, **text_style)
+    ax.set_xlim(x[0], x[-1])
+    if date_axis:
+        fix_date_xticks(ax)
+    ax.set_ylim(*ylim)
+
+
 # format xaxis, ticks and labels
+# locators are bound to the axis they are set on and can not be shared, create
+# new ones for every axis
 def format_date_xticks(ax, minor=True):
     ax.xaxis.set_major_locator(
         matplotlib.dates.WeekdayLocator(interval=1, byweekday=matplotlib.dates.SU)
@@ -1571,26 +1705,130 @@ def format_date_xticks(ax, minor=True):
     ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%m/%d"))
 
 
+# same ticks as `format_date_xticks` for an axis whose limits are final, call after
+# `set_xlim`. the sundays and days are placed once instead of being searched by the
+# date locators on every draw
+def fix_date_xticks(ax, minor=True):
+    lo, hi = ax.get_xlim()
+    days = np.arange(np.ceil(lo), np.floor(hi) + 1)
+    if len(days) > 0:
+        to_sunday = (6 - matplotlib.dates.num2date(days[0]).weekday()) % 7
+    else:
+        to_sunday = 0
+    ax.xaxis.set_major_locator(matplotlib.ticker.FixedLocator(days[to_sunday::7]))
+    if minor:
+        ax.xaxis.set_minor_locator(matplotlib.ticker.FixedLocator(days))
+    ax.xaxis.set_major_formatter(matplotlib.dates.DateFormatter("%m/%d"))
+
+
+# format strings of `truncate_number` for the precisions used in the figures
+_number_formats = {p: f"{{:.{p}f}}" for p in range(6)}
+
+
 def truncate_number(number, precision):
-    return "{{:.{}f}}".format(precision).format(number)
+    fmt = _number_formats.get(precision)
+    if fmt is None:
+        return format(number, f".{precision}f")
+    return fmt.format(number)
 
 
 def print_median_CI(arr, prec=2):
     f_trunc = lambda n: truncate_number(n, prec)
-    med = f_trunc(np.median(arr))
-    perc1, perc2 = (
-        f_trunc(np.percentile(arr, q=2.5)),
-        f_trunc(np.percentile(arr, q=97.5)),
-    )
+    perc1, med, perc2 = (f_trunc(q) for q in _median_CI(arr))
     return "Median: {}\nCI: [{}, {}]".format(med, perc1, perc2)
 
 
-def conv_time_to_mpl_dates(arr):
-    try:
-        return matplotlib.dates.date2num(
-            [datetime.timedelta(days=float(date)) + date_begin_sim for date in arr]
-        )
-    except:
-        return matplotlib.dates.date2num(
-            datetime.timedelta(days=float(arr)) + date_begin_sim
+# density of the change point priors of figure 0, in closed form. the scipy.stats
+# distributions check their arguments on every call, which takes longer than the
+# points themselves. the distributions figure takes its priors from the model
+def _norm_pdf(x, loc, scale):
+    z = (np.asarray(x) - loc) / scale
+    return np.exp(-0.5 * z ** 2) / (scale * np.sqrt(2 * np.pi))
+
+
+# lower bound of the 95% CI, median and upper bound in a single pass over `arr`
+def _median_CI(arr):
+    return np.quantile(arr, (0.025, 0.5, 0.975))
+
+
+# summaries of the traces, per trace and name. the traces are only referenced
+# weakly, their entries are dropped together with them
+_stat_cache = weakref.WeakKeyDictionary()
+
+
+def _cached(obj, name, func):
+    entries = _stat_cache.setdefault(obj, dict())
+    if name not in entries:
+        entries[name] = func()
+    return entries[name]
+
+
+# quantiles shown in the timeseries, bounds of the 95% CI, of the 75% CI and median.
+# computing all of them in one call costs about the same as a single one
+quantiles = (0.025, 0.125, 0.5, 0.875, 0.975)
+
+
+# the `num_samples_plot` samples of a variable that feed the bands. the same
+# seed picks the same samples for every variable of the trace
+def _plot_samples(trace, name):
+    def subsample():
+        values = trace[name]
+        if num_samples_plot is None or len(values) <= num_samples_plot:
+            return values
+        rng = np.random.default_rng(0)
+        return values[rng.choice(len(values), size=num_samples_plot, replace=False)]
+
+    return _cached(trace, "samples_" + name, subsample)
+
+
+# split the modelled new cases of a trace at the end of the data and add the
+# cumulative cases, which start with the last known value. dims: [sample, day]
+def _prepare(trace):
+    def prepare():
+        new_cases = _plot_samples(trace, "new_cases")
+        new_c_past = new_cases[:, :num_days_data]
+        new_c_futu = new_cases[:, num_days_data:]
+        # sum into the preallocated arrays, behind the column of the offset. float64,
+        # the cumulative cases are too large for float32
+        def cumulative(new_cases, offset):
+            cum = np.empty((new_cases.shape[0], new_cases.shape[1] + 1))
+            cum[:, 0] = offset
+            np.cumsum(new_cases, axis=1, out=cum[:, 1:])
+            cum[:, 1:] += offset
+            return cum
+
+        cum_c_past = cumulative(new_c_past, cases_obs[0])
+        cum_c_futu = cumulative(new_c_futu, cases_obs[-1])
+        return new_c_past, new_c_futu, cum_c_past, cum_c_futu
+
+    return _cached(trace, "prepared", prepare)
+
+
+# `quantiles` along the sample axis, unpack as lo, lo75, med, hi75, hi
+def _summarize(arr):
+    return np.quantile(arr, quantiles, axis=0)
+
+
+# `_summarize` of the same variable of several traces, `get_array(trace)` returns
+# the array of one trace. the arrays are joined along the day axis and summarized
+# in a single call if they have the same number of samples. the summaries are
+# cached per trace for the other figures
+def _summarize_all(traces, name, get_array):
+    arrays = [get_array(trace) for trace in traces]
+    if len({len(arr) for arr in arrays}) == 1:
+        summaries = np.split(
+            _summarize(np.concatenate(arrays, axis=1)),
+            np.cumsum([arr.shape[1] for arr in arrays])[:-1],
+            axis=1,
         )
+    else:
+        summaries = [_summarize(arr) for arr in arrays]
+    for trace, summary in zip(traces, summaries):
+        _stat_cache.setdefault(trace, dict())[name] = summary
+    return summaries
+
+
+# days since the begin of the simulation to matplotlib date numbers, which count
+# days as well. works for arrays and scalars
+def conv_time_to_mpl_dates(arr):
+    return np.asarray(arr, dtype=np.float64) + mpl_date_begin_sim